@@ -6,14 +6,175 @@ to make decisions. This is a simplified implementation and would require an
 actual LLM API integration to work.
 """
 
+import ast
+import asyncio
+import functools
+import hashlib
+import itertools
 import json
+import logging
+import math
+import re
+import sys
 import time
-from typing import Dict, List, Any, Optional
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, Iterator, List, Any, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy only speeds up the semantic cache
+    np = None
+
+
+log = logging.getLogger(__name__)
+
+
+# Pattern for a simple binary arithmetic expression, e.g. "125 * 37"
+_MATH_RE = re.compile(r'\d+\s*[\+\-\*\/]\s*\d+')
+
+# Any arithmetic operator character
+_OP_RE = re.compile(r'[\+\-\*\/]')
+
+# Separates independent requests within one prompt
+_CLAUSE_RE = re.compile(r" and |;")
+
+# Known locations for the weather tool, keyed by their lowercase form
+_LOCATIONS = {
+    "new york": "New York",
+    "london": "London",
+    "tokyo": "Tokyo",
+    "sydney": "Sydney"
+}
+
+# Extracts the tool names from an assistant message reporting tool results
+_TOOL_RESULT_RE = re.compile(r"^I used (\w+(?:, \w+)*)")
+
+# Maximum number of messages kept in the agent's memory
+MEMORY_SIZE = 64
+
+# Number of recent messages included in the conversation history prompt
+MEMORY_WINDOW = 5
+
+# Number of most recent messages that are never summarized
+PROTECT_LAST_N = 3
+
+# Maximum number of embeddings kept by _EmbedCache
+EMBED_CACHE_SIZE = 4096
+
+# Minimum cosine similarity for a query to reuse a cached response
+SEMANTIC_CACHE_THRESHOLD = 0.92
+
+# Maximum number of responses kept in the semantic cache
+SEMANTIC_CACHE_SIZE = 512
+
+# Maximum number of responses kept in the exact-match cache
+EXACT_CACHE_SIZE = 512
+
+# Number of previous messages that are part of an exact-match cache key
+EXACT_CACHE_CONTEXT = 4
+
+
+def _summarize(message: Dict[str, str]) -> str:
+    """Collapse an old tool-result message into a one-line summary."""
+    content = message["content"]
+    match = _TOOL_RESULT_RE.match(content)
+    if message["role"] != "assistant" or not match:
+        return content
+    status = "ERROR" if "Error" in content or "not found" in content else "OK"
+    tools = match.group(1).replace(", ", ",")
+    return f"[tool:{tools}] {status} ({len(content)} chars)"
+
+
+# AST nodes allowed in expressions passed to the calculator tool
+_ALLOWED_EXPR_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod, ast.Pow, ast.USub, ast.UAdd
+)
+
+# Largest exponent the calculator tool will raise a number to
+MAX_EXPONENT = 1000
+
+# Largest result of a power, in decimal digits, the calculator tool will compute
+MAX_POWER_DIGITS = 10000
+
+
+def _evaluate(node: ast.AST) -> Any:
+    """Evaluate an already validated expression subtree."""
+    return eval(compile(ast.Expression(node), "<calc>", "eval"), {"__builtins__": {}})
+
+
+def _check_powers(node: ast.AST) -> None:
+    """Reject powers whose exponent or result would be unreasonably large."""
+    # Check innermost powers first, so evaluating an operand is always cheap
+    for child in ast.iter_child_nodes(node):
+        _check_powers(child)
+    
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Pow):
+        base, exponent = _evaluate(node.left), _evaluate(node.right)
+        if abs(exponent) > MAX_EXPONENT:
+            raise ValueError(f"exponent larger than {MAX_EXPONENT}")
+        if abs(base) > 1 and abs(exponent) * math.log10(abs(base)) > MAX_POWER_DIGITS:
+            raise ValueError(f"result larger than {MAX_POWER_DIGITS} digits")
+
+
+def _validate(tree: ast.AST) -> None:
+    """Reject any expression that is not plain arithmetic on numbers."""
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_EXPR_NODES):
+            raise ValueError(f"unsupported syntax: {type(node).__name__}")
+        if isinstance(node, ast.Constant) and type(node.value) not in (int, float):
+            raise ValueError(f"unsupported constant: {node.value!r}")
+    
+    # Unbounded powers (e.g. 9**9**9) would hang the interpreter
+    _check_powers(tree.body)
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_expr(expression: str):
+    """Parse, validate and compile an arithmetic expression."""
+    tree = ast.parse(expression, mode="eval")
+    _validate(tree)
+    return compile(tree, "<calc>", "eval")
+
+
+def normalize(vector: List[float]) -> List[float]:
+    """Scale a vector to unit length so a dot product gives cosine similarity."""
+    norm = math.sqrt(sum(x * x for x in vector))
+    if norm == 0:
+        return list(vector)
+    return [x / norm for x in vector]
+
+
+class _EmbedCache:
+    """Memoize an embedding function, keyed on the SHA-1 of the text."""
+    
+    __slots__ = ("fn", "cache", "size")
+    
+    def __init__(self, fn: Callable[[str], List[float]], size: int = EMBED_CACHE_SIZE):
+        """Wrap an embedding function with an LRU cache of the given size."""
+        self.fn = fn
+        self.cache: "OrderedDict[bytes, List[float]]" = OrderedDict()
+        self.size = size
+    
+    def __call__(self, text: str) -> List[float]:
+        """Return the embedding of the text, computing it only on a cache miss."""
+        key = hashlib.sha1(text.encode()).digest()
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        
+        vector = self.fn(text)
+        self.cache[key] = vector
+        if len(self.cache) > self.size:
+            self.cache.popitem(last=False)
+        return vector
 
 
 class Tool:
     """A tool that the agent can use to interact with the environment."""
     
+    __slots__ = ("name", "description", "func")
+    
     def __init__(self, name: str, description: str, func: callable):
         """Initialize a tool with a name, description, and function."""
         self.name = name
@@ -35,17 +196,40 @@ class Tool:
 class LLMAgent:
     """An agent that uses a language model to make decisions."""
     
-    def __init__(self, name: str = "LLMAgent"):
-        """Initialize the agent with a name and tools."""
+    __slots__ = ("name", "simulate_latency", "memory", "tools", "_embedder", "_cache", "_cache_vectors",
+                 "_cache_keys", "_exact_cache", "_tools_prompt_cache")
+    
+    def __init__(self, name: str = "LLMAgent", simulate_latency: bool = False,
+                 embed_fn: Optional[Callable[[str], List[float]]] = None):
+        """
+        Initialize the agent with a name and tools.
+        
+        If simulate_latency is True, each simulated LLM call sleeps briefly to
+        mimic the round-trip time of a real API.
+        
+        If embed_fn is given (e.g. a sentence-transformers model's encode), it is
+        used to embed user inputs so that questions similar to ones already
+        answered are served from a semantic cache instead of the LLM.
+        """
         self.name = name
-        self.memory: List[Dict[str, str]] = []
+        self.simulate_latency = simulate_latency
+        self.memory: Deque[Dict[str, str]] = deque(maxlen=MEMORY_SIZE)
         self.tools: Dict[str, Tool] = {}
+        self._tools_prompt_cache: Optional[Tuple[Tuple[Tuple[str, str], ...], str]] = None
+        self._embedder = _EmbedCache(embed_fn) if embed_fn is not None else None
+        # Semantic cache: input -> (row, response), with the input's embedding
+        # stored in that row of _cache_vectors (a matrix when numpy is available)
+        self._cache: "OrderedDict[str, Tuple[int, str]]" = OrderedDict()
+        self._cache_vectors: Any = None if np is not None else []
+        self._cache_keys: List[str] = []
+        self._exact_cache: "OrderedDict[str, str]" = OrderedDict()
         self.register_default_tools()
     
     def register_tool(self, tool: Tool) -> None:
         """Register a tool that the agent can use."""
         self.tools[tool.name] = tool
-        print(f"Registered tool: {tool.name}")
+        self._tools_prompt_cache = None
+        log.debug("Registered tool: %s", tool.name)
     
     def register_default_tools(self) -> None:
         """Register default tools for the agent."""
@@ -71,9 +255,8 @@ class LLMAgent:
         def calculate(expression: str) -> str:
             """Evaluate a mathematical expression."""
             try:
-                # Warning: eval can be dangerous in production code
-                # This is just for demonstration
-                result = eval(expression, {"__builtins__": {}})
+                # Only arithmetic on numbers gets past _compile_expr
+                result = eval(_compile_expr(expression), {"__builtins__": {}})
                 return f"Result: {result}"
             except Exception as e:
                 return f"Error calculating: {e}"
@@ -87,10 +270,34 @@ class LLMAgent:
         """Add a message to the agent's memory."""
         self.memory.append({"role": role, "content": content})
     
+    def recent_memory(self, n: int) -> Iterator[Dict[str, str]]:
+        """Iterate over the last n messages in the agent's memory."""
+        return itertools.islice(self.memory, max(0, len(self.memory) - n), None)
+    
     def get_available_tools_prompt(self) -> str:
         """Get a prompt describing the available tools."""
-        tools_json = json.dumps([tool.to_dict() for tool in self.tools.values()], indent=2)
-        return f"You have access to the following tools:\n{tools_json}"
+        # Reserialize only when the described tools change, including edits
+        # made directly to self.tools
+        key = tuple((tool.name, tool.description) for tool in self.tools.values())
+        if self._tools_prompt_cache is None or self._tools_prompt_cache[0] != key:
+            tools_json = json.dumps([tool.to_dict() for tool in self.tools.values()], indent=2)
+            self._tools_prompt_cache = (key, f"You have access to the following tools:\n{tools_json}")
+        return self._tools_prompt_cache[1]
+    
+    def get_memory_prompt(self) -> str:
+        """
+        Get the recent conversation history as a prompt.
+        
+        Tool results older than the last few messages are replaced by a short
+        summary. Only the prompt is compressed; the memory itself is untouched.
+        """
+        recent = list(self.recent_memory(MEMORY_WINDOW))
+        cutoff = len(recent) - PROTECT_LAST_N
+        lines = []
+        for i, message in enumerate(recent):
+            content = _summarize(message) if i < cutoff else message["content"]
+            lines.append(f"{message['role']}: {content}")
+        return "\n".join(lines)
     
     def simulate_llm_response(self, prompt: str) -> Dict[str, Any]:
         """
@@ -99,6 +306,28 @@ class LLMAgent:
         In a real implementation, this would call an actual LLM API like OpenAI.
         This is just a simplified simulation for demonstration purposes.
         """
+        response = self.simulate_intent(prompt)
+        
+        # Several requests joined by "and" ask for several tools at once
+        if " and " in prompt or ";" in prompt:
+            clauses = _CLAUSE_RE.split(prompt)
+            intents = [self.simulate_intent(clause) for clause in clauses]
+            intents = [intent for intent in intents if intent["action"]]
+            if len(intents) > 1:
+                response = {
+                    "action": None,
+                    "action_input": None,
+                    "tool_calls": [(intent["action"], intent["action_input"]) for intent in intents],
+                    "thoughts": " ".join(intent["thoughts"] for intent in intents)
+                }
+        
+        # Simulate thinking time
+        if self.simulate_latency:
+            time.sleep(0.5)
+        return response
+    
+    def simulate_intent(self, prompt: str) -> Dict[str, Any]:
+        """Simulate the LLM's choice of a single action for a prompt."""
         # Simple keyword-based simulation
         response = {
             "action": None,
@@ -106,27 +335,23 @@ class LLMAgent:
             "thoughts": "I need to determine the best course of action."
         }
         
-        if "weather" in prompt.lower():
+        lower = prompt.lower()
+        
+        if "weather" in lower:
             response["action"] = "get_weather"
             # Extract location (very simplified)
-            if "new york" in prompt.lower():
-                response["action_input"] = "New York"
-            elif "london" in prompt.lower():
-                response["action_input"] = "London"
-            elif "tokyo" in prompt.lower():
-                response["action_input"] = "Tokyo"
-            elif "sydney" in prompt.lower():
-                response["action_input"] = "Sydney"
-            else:
-                response["action_input"] = "New York"  # Default
+            response["action_input"] = "New York"  # Default
+            for key, location in _LOCATIONS.items():
+                if key in lower:
+                    response["action_input"] = location
+                    break
             
             response["thoughts"] = f"The user is asking about weather. I should check the weather in {response['action_input']}."
         
-        elif "calculate" in prompt.lower() or any(op in prompt for op in ["+", "-", "*", "/"]):
+        elif "calculate" in lower or _OP_RE.search(prompt):
             response["action"] = "calculate"
             # Very simplified extraction of a math expression
-            import re
-            match = re.search(r'\d+\s*[\+\-\*\/]\s*\d+', prompt)
+            match = _MATH_RE.search(prompt)
             if match:
                 response["action_input"] = match.group(0).replace(" ", "")
                 response["thoughts"] = f"This looks like a calculation request. I'll compute {response['action_input']}."
@@ -134,7 +359,7 @@ class LLMAgent:
                 response["action_input"] = "2+2"  # Default
                 response["thoughts"] = "I'm not sure what to calculate, but I'll do a simple calculation."
         
-        elif "search" in prompt.lower() or "find" in prompt.lower() or "look up" in prompt.lower():
+        elif "search" in lower or "find" in lower or "look up" in lower:
             response["action"] = "search"
             # Simplistic query extraction
             response["action_input"] = prompt.replace("search", "").replace("find", "").replace("look up", "").strip()
@@ -145,8 +370,6 @@ class LLMAgent:
             response["thoughts"] = "I don't have a specific tool for this request. I'll just respond conversationally."
             response["response"] = "I'm not sure how to help with that specific request. Could you try asking something about the weather, a calculation, or a search query?"
         
-        # Simulate thinking time
-        time.sleep(0.5)
         return response
     
     def process_tool_use(self, action: str, action_input: Any) -> str:
@@ -160,51 +383,194 @@ class LLMAgent:
         else:
             return f"Tool '{action}' not found."
     
-    def process(self, user_input: str) -> str:
-        """Process a user input and return a response."""
+    async def aprocess_tool_use(self, action: str, action_input: Any) -> str:
+        """Process a tool use action in a worker thread and return the result."""
+        if action in self.tools:
+            loop = asyncio.get_running_loop()
+            try:
+                result = await loop.run_in_executor(
+                    None, functools.partial(self.tools[action], action_input))
+                return f"Tool '{action}' returned: {result}"
+            except Exception as e:
+                return f"Error using tool '{action}': {e}"
+        else:
+            return f"Tool '{action}' not found."
+    
+    def exact_cache_key(self, user_input: str) -> str:
+        """Hash the user input together with the most recent conversation turns."""
+        context = "|".join(m["content"] for m in self.recent_memory(EXACT_CACHE_CONTEXT))
+        return hashlib.blake2b((user_input + context).encode(), digest_size=16).hexdigest()
+    
+    def store_in_exact_cache(self, key: str, response: str) -> None:
+        """Cache a response by key, evicting the least recently used entry when full."""
+        self._exact_cache[key] = response
+        self._exact_cache.move_to_end(key)
+        if len(self._exact_cache) > EXACT_CACHE_SIZE:
+            self._exact_cache.popitem(last=False)
+    
+    def lookup_cache(self, query_vector: List[float]) -> Optional[str]:
+        """Return the cached response most similar to the query, if close enough."""
+        if not self._cache:
+            return None
+        
+        # Rows 0..len-1 of the vector store are exactly the cached entries
+        if np is not None:
+            similarities = self._cache_vectors[:len(self._cache)] @ np.asarray(query_vector)
+            best_row = int(similarities.argmax())
+            best_similarity = similarities[best_row]
+        else:
+            best_row, best_similarity = 0, -1.0
+            for row, vector in enumerate(self._cache_vectors):
+                similarity = sum(a * b for a, b in zip(vector, query_vector))
+                if similarity > best_similarity:
+                    best_row, best_similarity = row, similarity
+        
+        if best_similarity < SEMANTIC_CACHE_THRESHOLD:
+            return None
+        best_key = self._cache_keys[best_row]
+        self._cache.move_to_end(best_key)
+        return self._cache[best_key][1]
+    
+    def store_in_cache(self, user_input: str, query_vector: List[float], response: str) -> None:
+        """Cache a response, evicting the least recently used entry when full."""
+        if user_input in self._cache:
+            row = self._cache[user_input][0]
+        elif len(self._cache) < SEMANTIC_CACHE_SIZE:
+            row = len(self._cache)
+        else:
+            # Reuse the row of the least recently used entry
+            _, (row, _) = self._cache.popitem(last=False)
+        
+        if np is not None:
+            if self._cache_vectors is None:
+                self._cache_vectors = np.empty((SEMANTIC_CACHE_SIZE, len(query_vector)))
+            self._cache_vectors[row] = query_vector
+        elif row == len(self._cache_vectors):
+            self._cache_vectors.append(query_vector)
+        else:
+            self._cache_vectors[row] = query_vector
+        
+        if row == len(self._cache_keys):
+            self._cache_keys.append(user_input)
+        else:
+            self._cache_keys[row] = user_input
+        self._cache[user_input] = (row, response)
+        self._cache.move_to_end(user_input)
+    
+    def check_caches(self, user_input: str) -> Tuple[str, Optional[List[float]], Optional[str]]:
+        """
+        Record the user input and look it up in the response caches.
+        
+        Returns the exact-match key, the query embedding (if an embedder is
+        set) and the cached response, or None on a miss.
+        """
+        # An identical question in an identical context gets an identical answer
+        exact_key = self.exact_cache_key(user_input)
+        
         # Add user input to memory
         self.add_to_memory("user", user_input)
         
-        # Create prompt for LLM
-        tools_prompt = self.get_available_tools_prompt()
-        memory_prompt = "\n".join([f"{m['role']}: {m['content']}" for m in self.memory[-5:]])
-        prompt = f"{tools_prompt}\n\nConversation history:\n{memory_prompt}\n\nHow would you respond to this?"
+        if exact_key in self._exact_cache:
+            self._exact_cache.move_to_end(exact_key)
+            cached_response = self._exact_cache[exact_key]
+            log.debug("⚡ %s is reusing a cached response", self.name)
+            self.add_to_memory("assistant", cached_response)
+            return exact_key, None, cached_response
         
-        # Get LLM response (simulated)
-        llm_response = self.simulate_llm_response(user_input)
+        # Reuse the answer to a semantically similar question if we have one
+        query_vector = None
+        if self._embedder is not None:
+            query_vector = normalize(list(self._embedder(user_input)))
+            cached_response = self.lookup_cache(query_vector)
+            if cached_response is not None:
+                log.debug("⚡ %s is reusing a cached response", self.name)
+                self.add_to_memory("assistant", cached_response)
+                return exact_key, query_vector, cached_response
         
-        # Process the response
-        if llm_response.get("action") and llm_response.get("action_input") is not None:
+        return exact_key, query_vector, None
+    
+    def get_tool_calls(self, llm_response: Dict[str, Any]) -> List[Tuple[str, Any]]:
+        """Return the (action, action_input) pairs the LLM asked for."""
+        if llm_response.get("tool_calls"):
+            # The LLM wants to use several tools
+            calls = list(llm_response["tool_calls"])
+        elif llm_response.get("action") and llm_response.get("action_input") is not None:
             # The LLM wants to use a tool
-            action = llm_response["action"]
-            action_input = llm_response["action_input"]
-            
-            print(f"🤔 {self.name} is thinking: {llm_response['thoughts']}")
-            print(f"🛠️ {self.name} is using tool: {action}({action_input})")
-            
-            # Use the tool
-            tool_result = self.process_tool_use(action, action_input)
-            
-            # Create final response
-            final_response = f"I used {action} to help answer your question. {tool_result}"
-            self.add_to_memory("assistant", final_response)
-            return final_response
+            calls = [(llm_response["action"], llm_response["action_input"])]
+        else:
+            return []
+        
+        log.debug("🤔 %s is thinking: %s", self.name, llm_response['thoughts'])
+        for action, action_input in calls:
+            log.debug("🛠️ %s is using tool: %s(%s)", self.name, action, action_input)
+        return calls
+    
+    def respond(self, user_input: str, exact_key: str, query_vector: Optional[List[float]],
+                llm_response: Dict[str, Any], calls: List[Tuple[str, Any]],
+                tool_results: List[str]) -> str:
+        """Build the final response, remember it and cache it."""
+        if calls:
+            # Create final response from the tool results
+            actions = ", ".join(action for action, _ in calls)
+            final_response = f"I used {actions} to help answer your question. {' '.join(tool_results)}"
         
         elif llm_response.get("response"):
             # The LLM provided a direct response
-            print(f"🤔 {self.name} is thinking: {llm_response['thoughts']}")
-            self.add_to_memory("assistant", llm_response["response"])
-            return llm_response["response"]
+            log.debug("🤔 %s is thinking: %s", self.name, llm_response['thoughts'])
+            final_response = llm_response["response"]
         
         else:
             # Fallback response
-            fallback = "I'm not sure how to respond to that."
-            self.add_to_memory("assistant", fallback)
-            return fallback
-
+            final_response = "I'm not sure how to respond to that."
+        
+        self.add_to_memory("assistant", final_response)
+        self.store_in_exact_cache(exact_key, final_response)
+        if query_vector is not None:
+            self.store_in_cache(user_input, query_vector, final_response)
+        return final_response
+    
+    def process(self, user_input: str) -> str:
+        """Process a user input and return a response."""
+        exact_key, query_vector, cached_response = self.check_caches(user_input)
+        if cached_response is not None:
+            return cached_response
+        
+        # Get LLM response (simulated)
+        llm_response = self.simulate_llm_response(user_input)
+        
+        # Use the tools one after another
+        calls = self.get_tool_calls(llm_response)
+        tool_results = [self.process_tool_use(action, action_input) for action, action_input in calls]
+        
+        return self.respond(user_input, exact_key, query_vector, llm_response, calls, tool_results)
+    
+    async def aprocess(self, user_input: str) -> str:
+        """
+        Process a user input and return a response without blocking the event loop.
+        
+        The LLM call and the tools run in a thread pool, so when the LLM asks
+        for several tools at once they run concurrently.
+        """
+        exact_key, query_vector, cached_response = self.check_caches(user_input)
+        if cached_response is not None:
+            return cached_response
+        
+        # Get LLM response (simulated)
+        loop = asyncio.get_running_loop()
+        llm_response = await loop.run_in_executor(None, self.simulate_llm_response, user_input)
+        
+        # Use the tools concurrently
+        calls = self.get_tool_calls(llm_response)
+        tool_results = await asyncio.gather(
+            *(self.aprocess_tool_use(action, action_input) for action, action_input in calls))
+        
+        return self.respond(user_input, exact_key, query_vector, llm_response, calls, list(tool_results))
 
 # Example usage
 if __name__ == "__main__":
+    logging.basicConfig(format="%(message)s", stream=sys.stdout)
+    log.setLevel(logging.DEBUG)
+    
     # Create an LLM-based agent
     agent = LLMAgent("Jarvis")
     
@@ -222,4 +588,11 @@ if __name__ == "__main__":
         print(f"\n👤 User: {query}")
         response = agent.process(query)
         print(f"🤖 {agent.name}: {response}")
-        print("-" * 50)
\ No newline at end of file
+        print("-" * 50)
+    
+    # Independent requests in one query run their tools concurrently
+    print("\n=== Concurrent Tool Use ===")
+    query = "What's the weather in Sydney and calculate 12 * 4"
+    print(f"\n👤 User: {query}")
+    response = asyncio.run(agent.aprocess(query))
+    print(f"🤖 {agent.name}: {response}")
\ No newline at end of file
@@ -5,9 +5,178 @@ This example demonstrates a model-based agent that maintains an internal state
 of the world and uses it to make decisions.
 """
 
+import ast
+import functools
+import logging
+import re
+import sys
+from enum import IntEnum
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed by ModelBasedAgentPool
+    np = None
+
+
+log = logging.getLogger(__name__)
+
+
+class _State(IntEnum):
+    """A categorical model value that prints as its lowercase name."""
+    
+    def __repr__(self):
+        return repr(self.name.lower())
+    
+    def __str__(self):
+        return self.name.lower()
+
+
+class Temp(_State):
+    """Room temperature."""
+    COLD = 0
+    NORMAL = 1
+    HOT = 2
+
+
+class Light(_State):
+    """Room lighting."""
+    DARK = 0
+    NORMAL = 1
+    BRIGHT = 2
+
+
+class Noise(_State):
+    """Noise level."""
+    QUIET = 0
+    NOISY = 1
+
+
+class TimeOfDay(_State):
+    """Time of day."""
+    MORNING = 0
+    DAY = 1
+    EVENING = 2
+    NIGHT = 3
+
+
+# Action effects on the model (simplified)
+ACTION_EFFECTS = {
+    "turn_on_ac": {"room_temperature": Temp.NORMAL, "energy_level": -5},
+    "turn_on_heater": {"room_temperature": Temp.NORMAL, "energy_level": -5},
+    "turn_on_light": {"room_lighting": Light.NORMAL, "energy_level": -1},
+    "close_blinds": {"room_lighting": Light.NORMAL, "energy_level": -1},
+    "investigate_noise": {"noise_level": Noise.QUIET, "energy_level": -10},
+    "eat_food": {"last_meal": 0, "energy_level": +30},
+    "rest": {"energy_level": +50},
+    "escape": {"danger_present": False, "energy_level": -20}
+}
+
+
+# Priority-ordered (condition, action) rules used by ModelBasedAgent.think().
+# Each condition is a Python expression over the model, bound to "m".
+RULES = (
+    # First priority: Handle danger
+    ('m["danger_present"]', "escape"),
+    
+    # Second priority: Critical needs
+    ('m["energy_level"] < 20', "rest"),
+    ('m["last_meal"] > 6', "eat_food"),
+    
+    # Third priority: Comfort adjustments
+    ('m["room_temperature"] == Temp.COLD', "turn_on_heater"),
+    ('m["room_temperature"] == Temp.HOT', "turn_on_ac"),
+    ('m["room_lighting"] == Light.DARK and m["time_of_day"] != TimeOfDay.NIGHT', "turn_on_light"),
+    ('m["room_lighting"] == Light.BRIGHT and m["time_of_day"] == TimeOfDay.NIGHT', "close_blinds"),
+    
+    # Fourth priority: Investigate anomalies
+    ('m["noise_level"] == Noise.NOISY', "investigate_noise")
+)
+
+
+def _tick_all(energy_level, last_meal, hungry):
+    """Advance the numeric part of every model in a pool by one step, in place."""
+    last_meal += 4 * hungry
+    
+    # Decrease energy over time
+    np.maximum(energy_level - 2, 0, out=energy_level)
+
+
+@functools.lru_cache(maxsize=None)
+def _tick_all_kernel():
+    """
+    Return the pool-wide tick, compiled with numba when it is installed.
+    
+    numba is imported here rather than at module import, so agents that never
+    create a pool do not pay for it.
+    """
+    try:
+        from numba import njit
+    except ImportError:  # numba is optional
+        return _tick_all
+    
+    @njit
+    def tick_all(energy_level, last_meal, hungry):
+        for i in range(energy_level.shape[0]):
+            if hungry[i]:
+                last_meal[i] += 4
+            
+            # Decrease energy over time
+            energy_level[i] = max(energy_level[i] - 2, 0)
+    
+    return tick_all
+
+
+# (keyword, field, value) model updates. Where two keywords set the same
+# field, the one listed later wins (e.g. "cold" beats "hot").
+_PERCEPT_ACTIONS = (
+    ("hot", "room_temperature", Temp.HOT),
+    ("cold", "room_temperature", Temp.COLD),
+    ("bright", "room_lighting", Light.BRIGHT),
+    ("dark", "room_lighting", Light.DARK),
+    ("noise", "noise_level", Noise.NOISY),
+    ("danger", "danger_present", True),
+    ("smoke", "danger_present", True),
+    ("night", "time_of_day", TimeOfDay.NIGHT),
+    ("morning", "time_of_day", TimeOfDay.MORNING)
+)
+
+
+# Enum member references in rule conditions, e.g. "Temp.COLD"
+_ENUMS = {"Temp": Temp, "Light": Light, "Noise": Noise, "TimeOfDay": TimeOfDay}
+_ENUM_MEMBER_RE = re.compile(r"\b(" + "|".join(_ENUMS) + r")\.([A-Z_]+)\b")
+
+
+def _compile_rules(rules):
+    """
+    Generate a think() method from priority-ordered (condition, action) rules.
+    
+    The rules become a straight-line chain of if statements, so deciding takes
+    no loop or per-rule function call. Enum members are inlined as int
+    literals, so a comparison costs no global or attribute lookup.
+    """
+    def inline(match):
+        return str(int(_ENUMS[match.group(1)][match.group(2)]))
+    
+    lines = [
+        "def think(self):",
+        '    """Process the current model and decide on an action."""',
+        "    m = self.model"
+    ]
+    for condition, action in rules:
+        lines.append(f"    if {_ENUM_MEMBER_RE.sub(inline, condition)}:  # {condition}")
+        lines.append(f"        return {action!r}")
+    lines.append("    return 'do_nothing'")
+    
+    namespace = {}
+    exec(compile("\n".join(lines), "<rules>", "exec"), namespace)
+    return namespace["think"]
+
+
 class ModelBasedAgent:
     """A model-based agent that maintains internal state of the environment."""
     
+    __slots__ = ("name", "actions_taken", "model", "action_effects")
+    
     def __init__(self, name="ModelAgent"):
         """Initialize the agent with a name and internal model."""
         self.name = name
@@ -15,50 +184,24 @@ class ModelBasedAgent:
         
         # Internal model of the world
         self.model = {
-            "room_temperature": "normal",  # cold, normal, hot
-            "room_lighting": "normal",     # dark, normal, bright
-            "noise_level": "quiet",        # quiet, noisy
+            "room_temperature": Temp.NORMAL,
+            "room_lighting": Light.NORMAL,
+            "noise_level": Noise.QUIET,
             "danger_present": False,       # True if danger detected
-            "time_of_day": "day",          # morning, day, evening, night
+            "time_of_day": TimeOfDay.DAY,
             "last_meal": 0,                # hours since last meal
             "energy_level": 100            # 0-100 scale
         }
         
         # Action effects on the model (simplified)
-        self.action_effects = {
-            "turn_on_ac": {"room_temperature": "normal", "energy_level": -5},
-            "turn_on_heater": {"room_temperature": "normal", "energy_level": -5},
-            "turn_on_light": {"room_lighting": "normal", "energy_level": -1},
-            "close_blinds": {"room_lighting": "normal", "energy_level": -1},
-            "investigate_noise": {"noise_level": "quiet", "energy_level": -10},
-            "eat_food": {"last_meal": 0, "energy_level": +30},
-            "rest": {"energy_level": +50},
-            "escape": {"danger_present": False, "energy_level": -20}
-        }
+        self.action_effects = {action: dict(effects) for action, effects in ACTION_EFFECTS.items()}
     
     def update_model(self, percept):
         """Update the internal model based on new percepts."""
         # Parse percept to update model (simplified)
-        if "cold" in percept:
-            self.model["room_temperature"] = "cold"
-        elif "hot" in percept:
-            self.model["room_temperature"] = "hot"
-            
-        if "dark" in percept:
-            self.model["room_lighting"] = "dark"
-        elif "bright" in percept:
-            self.model["room_lighting"] = "bright"
-            
-        if "noise" in percept:
-            self.model["noise_level"] = "noisy"
-            
-        if "danger" in percept or "smoke" in percept:
-            self.model["danger_present"] = True
-            
-        if "morning" in percept:
-            self.model["time_of_day"] = "morning"
-        elif "night" in percept:
-            self.model["time_of_day"] = "night"
+        for keyword, field, value in _PERCEPT_ACTIONS:
+            if keyword in percept:
+                self.model[field] = value
             
         if "hungry" in percept:
             self.model["last_meal"] += 4
@@ -68,52 +211,23 @@ class ModelBasedAgent:
         if self.model["energy_level"] < 0:
             self.model["energy_level"] = 0
             
-        print(f"{self.name} updated model: {self.model}")
+        log.debug("%s updated model: %s", self.name, self.model)
     
     def perceive(self, environment_state):
         """Perceive the current state of the environment."""
-        print(f"{self.name} perceives: {environment_state}")
+        log.debug("%s perceives: %s", self.name, environment_state)
         self.update_model(environment_state)
         return self
     
-    def think(self):
-        """Process the current model and decide on an action."""
-        # Priority-based decision making
-        
-        # First priority: Handle danger
-        if self.model["danger_present"]:
-            return "escape"
-            
-        # Second priority: Critical needs
-        if self.model["energy_level"] < 20:
-            return "rest"
-        if self.model["last_meal"] > 6:
-            return "eat_food"
-            
-        # Third priority: Comfort adjustments
-        if self.model["room_temperature"] == "cold":
-            return "turn_on_heater"
-        if self.model["room_temperature"] == "hot":
-            return "turn_on_ac"
-            
-        if self.model["room_lighting"] == "dark" and self.model["time_of_day"] != "night":
-            return "turn_on_light"
-        if self.model["room_lighting"] == "bright" and self.model["time_of_day"] == "night":
-            return "close_blinds"
-            
-        # Fourth priority: Investigate anomalies
-        if self.model["noise_level"] == "noisy":
-            return "investigate_noise"
-            
-        # Default action
-        return "do_nothing"
+    # Rules are checked in priority order; the first match wins
+    think = _compile_rules(RULES)
     
     def act(self):
         """Execute the selected action and update the model."""
         action = self.think()
         self.actions_taken += 1
         
-        print(f"{self.name} performs action: {action} (Total actions: {self.actions_taken})")
+        log.debug("%s performs action: %s (Total actions: %s)", self.name, action, self.actions_taken)
         
         # Update model based on action effects
         if action in self.action_effects:
@@ -127,8 +241,132 @@ class ModelBasedAgent:
         return f"Agent '{self.name}' with model: {self.model} and {self.actions_taken} actions taken"
 
 
+class _Vectorize(ast.NodeTransformer):
+    """Rewrite a rule condition so it works element-wise on NumPy arrays."""
+    
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        op = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+        return functools.reduce(lambda left, right: ast.BinOp(left, op, right), node.values)
+    
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return ast.UnaryOp(ast.Invert(), node.operand)
+        return node
+
+
+def _vectorize_rule(condition):
+    """Compile a rule condition for evaluation over arrays of model fields."""
+    tree = _Vectorize().visit(ast.parse(condition, mode="eval"))
+    return compile(ast.fix_missing_locations(tree), "<rules>", "eval")
+
+
+# RULES conditions compiled for ModelBasedAgentPool.think_all()
+_VECTOR_RULES = tuple(_vectorize_rule(condition) for condition, _ in RULES)
+_VECTOR_RULE_GLOBALS = {"__builtins__": {}, **_ENUMS}
+
+
+class ModelBasedAgentPool:
+    """
+    A batch of model-based agents stored as one NumPy array per model field.
+    
+    Behaves like N independent ModelBasedAgents, but each step is a handful of
+    vectorized array operations instead of N Python-level calls. Categorical
+    fields are stored as their enum values and actions as indices into ACTIONS.
+    """
+    
+    # Enum type of each categorical model field
+    CATEGORIES = {
+        "room_temperature": Temp,
+        "room_lighting": Light,
+        "noise_level": Noise,
+        "time_of_day": TimeOfDay
+    }
+    
+    # Model fields, each stored as one array across the pool
+    FIELDS = ("room_temperature", "room_lighting", "noise_level", "danger_present",
+              "time_of_day", "last_meal", "energy_level")
+    
+    # Actions in priority order, as returned by think_all()
+    ACTIONS = tuple(action for _, action in RULES) + ("do_nothing",)
+    
+    def __init__(self, size):
+        """Initialize a pool of agents, all starting from the default model."""
+        if np is None:
+            raise ImportError("ModelBasedAgentPool requires numpy")
+        
+        self.size = size
+        self.actions_taken = 0
+        self._tick_all = _tick_all_kernel()
+        
+        # Internal model of the world, one entry per agent
+        self.room_temperature = np.full(size, Temp.NORMAL, np.int8)
+        self.room_lighting = np.full(size, Light.NORMAL, np.int8)
+        self.noise_level = np.full(size, Noise.QUIET, np.int8)
+        self.danger_present = np.zeros(size, np.bool_)
+        self.time_of_day = np.full(size, TimeOfDay.DAY, np.int8)
+        self.last_meal = np.zeros(size, np.int32)
+        self.energy_level = np.full(size, 100, np.int32)
+    
+    def __len__(self):
+        """Return the number of agents in the pool."""
+        return self.size
+    
+    def model(self, index):
+        """Return the model of a single agent in the ModelBasedAgent format."""
+        model = {}
+        for field in self.FIELDS:
+            value = getattr(self, field)[index].item()
+            if field in self.CATEGORIES:
+                value = self.CATEGORIES[field](value)
+            model[field] = value
+        return model
+    
+    def perceive_all(self, percepts):
+        """Update every agent's model from its percept (one string per agent)."""
+        if len(percepts) != self.size:
+            raise ValueError(f"expected {self.size} percepts, got {len(percepts)}")
+        
+        def contains(keyword):
+            return np.fromiter((keyword in percept for percept in percepts), np.bool_, self.size)
+        
+        # Same updates, in the same order, as ModelBasedAgent.update_model
+        for keyword, field, value in _PERCEPT_ACTIONS:
+            getattr(self, field)[contains(keyword)] = value
+        
+        self._tick_all(self.energy_level, self.last_meal, contains("hungry"))
+        return self
+    
+    def think_all(self):
+        """Decide on an action for every agent; returns indices into ACTIONS."""
+        # The same RULES as ModelBasedAgent.think, evaluated element-wise
+        model = {field: getattr(self, field) for field in self.FIELDS}
+        conditions = [eval(condition, _VECTOR_RULE_GLOBALS, {"m": model})
+                      for condition in _VECTOR_RULES]
+        return np.select(conditions, np.arange(len(conditions)), default=len(conditions))
+    
+    def act_all(self):
+        """Execute every agent's selected action and update the models."""
+        actions = self.think_all()
+        self.actions_taken += 1
+        
+        # Update models based on action effects
+        for code, action in enumerate(self.ACTIONS):
+            if action not in ACTION_EFFECTS:
+                continue
+            mask = actions == code
+            for field, value in ACTION_EFFECTS[action].items():
+                getattr(self, field)[mask] = value
+        
+        return actions
+
+
 # Example usage
 if __name__ == "__main__":
+    logging.basicConfig(format="%(message)s", stream=sys.stdout)
+    log.setLevel(logging.DEBUG)
+    
     # Create a model-based agent
     agent = ModelBasedAgent("HomeAssistant")
     
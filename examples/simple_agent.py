@@ -5,9 +5,47 @@ This is a basic example of a reflex agent that responds to environment states
 with predefined actions.
 """
 
+import functools
+import logging
+import sys
+from types import MappingProxyType
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is optional
+    ahocorasick = None
+
+
+log = logging.getLogger(__name__)
+
+# Below this many rules the generated if-chain beats an Aho-Corasick scan
+AUTOMATON_MIN_RULES = 32
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_matcher(rules):
+    """
+    Generate a function returning the action of the first matching rule.
+    
+    Each (condition, action) rule becomes one "if condition in percept" check
+    in straight-line code, in rule order.
+    """
+    lines = ["def _match(percept):"]
+    for condition, action in rules:
+        lines.append(f"    if {condition!r} in percept:")
+        lines.append(f"        return {action!r}")
+    lines.append("    return None")
+    
+    namespace = {}
+    exec(compile("\n".join(lines), "<rules>", "exec"), namespace)
+    return namespace["_match"]
+
+
 class SimpleAgent:
     """A simple reflex agent that responds to environment states."""
     
+    __slots__ = ("name", "percepts", "actions_taken", "_rules", "_automaton", "_match")
+    
     def __init__(self, name="Agent"):
         """Initialize the agent with a name."""
         self.name = name
@@ -26,10 +64,44 @@ class SimpleAgent:
             "danger": "escape"
         }
     
+    @property
+    def rules(self):
+        """The condition-action rules, in priority order (read-only)."""
+        return MappingProxyType(self._rules)
+    
+    @rules.setter
+    def rules(self, rules):
+        """Replace the condition-action rules and rebuild the rule matchers."""
+        self._rules = dict(rules)
+        self._automaton = self._build_automaton()
+        self._match = _compile_matcher(tuple(self._rules.items()))
+    
+    def _build_automaton(self):
+        """Build an Aho-Corasick automaton over the rule conditions, if worthwhile."""
+        if ahocorasick is None or len(self._rules) < AUTOMATON_MIN_RULES:
+            return None
+        automaton = ahocorasick.Automaton()
+        for priority, (condition, action) in enumerate(self._rules.items()):
+            automaton.add_word(condition, (priority, action))
+        automaton.make_automaton()
+        return automaton
+    
+    def match_rule(self, percept):
+        """Return the action of the first rule whose condition occurs in the percept."""
+        if self._automaton is not None:
+            # Single pass over the percept; earlier rules take precedence
+            best = None
+            for _, value in self._automaton.iter(percept):
+                if best is None or value < best:
+                    best = value
+            return best[1] if best is not None else None
+        
+        return self._match(percept)
+    
     def perceive(self, environment_state):
         """Perceive the current state of the environment."""
         self.percepts.append(environment_state)
-        print(f"{self.name} perceives: {environment_state}")
+        log.debug("%s perceives: %s", self.name, environment_state)
         return self
     
     def think(self):
@@ -40,20 +112,20 @@ class SimpleAgent:
         current_percept = self.percepts[-1]
         
         # Check if the percept matches any rule condition
-        for condition, action in self.rules.items():
-            if condition in current_percept:
-                print(f"{self.name} decides to: {action}")
-                return action
+        action = self.match_rule(current_percept)
+        if action is not None:
+            log.debug("%s decides to: %s", self.name, action)
+            return action
         
         # Default action if no rule matches
-        print(f"{self.name} decides to: do_nothing")
+        log.debug("%s decides to: do_nothing", self.name)
         return "do_nothing"
     
     def act(self):
         """Execute the selected action."""
         action = self.think()
         self.actions_taken += 1
-        print(f"{self.name} performs action: {action} (Total actions: {self.actions_taken})")
+        log.debug("%s performs action: %s (Total actions: %s)", self.name, action, self.actions_taken)
         return action
     
     def __str__(self):
@@ -63,6 +135,9 @@ class SimpleAgent:
 
 # Example usage
 if __name__ == "__main__":
+    logging.basicConfig(format="%(message)s", stream=sys.stdout)
+    log.setLevel(logging.DEBUG)
+    
     # Create a simple agent
     agent = SimpleAgent("HomeCare")
     